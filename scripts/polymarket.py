@@ -3,6 +3,10 @@
 # requires-python = ">=3.10"
 # dependencies = [
 #     "requests>=2.28.0",
+#     "orjson>=3.8",
+#     "ijson>=3.1",
+#     "brotli>=1.0",
+#     "pyahocorasick>=2.0",
 # ]
 # ///
 """
@@ -10,75 +14,377 @@ Polymarket prediction market data.
 """
 
 import argparse
+import hashlib
+import heapq
 import json
+import os
 import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime, timezone
-from urllib.parse import urlparse
+from functools import lru_cache, partial
+from operator import itemgetter
+from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+# All JSON (de)serialization goes through these; _dumps returns bytes
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 BASE_URL = "https://gamma-api.polymarket.com"
 
+# Shared session: keep-alive + connection pooling across fetch() calls,
+# so multi-request commands only pay the TLS handshake once.
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    # gzip/deflate, plus br (and zstd) when a decoder is installed
+    "Accept-Encoding": ACCEPT_ENCODING,
+    # Gamma only serves JSON; say so rather than the default */*
+    "Accept": "application/json",
+    "User-Agent": "clawdbot-polymarket/1.0",
+})
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504]),
+)
+# Same pooling/retry policy whatever scheme BASE_URL is pointed at
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
 
-def fetch(endpoint: str, params: dict = None) -> dict:
-    """Fetch from Gamma API."""
+def _speculate(fn, *args) -> Future:
+    """Run fn(*args) on a daemon thread and return a Future for its result.
+    
+    For fallbacks started before we know they're needed, so they overlap
+    the primary lookup: the interpreter doesn't wait for daemon threads
+    at exit, so an unused fallback never delays the command.
+    """
+    future = Future()
+    
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+    
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+# On-disk response cache: served as-is for CACHE_TTL seconds, then
+# revalidated with ETag / Last-Modified. --fresh skips reading it.
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'polymarket'
+CACHE_TTL = 45
+# Entries untouched for this long are deleted (once per run, on first write)
+CACHE_MAX_AGE = 24 * 3600
+_FRESH = False
+_PRUNED = False
+
+
+def _cache_path(endpoint: str, params: dict = None) -> Path:
+    """Cache file for an (endpoint, params) pair."""
+    # Values are sent as strings, so 5 and '5' share an entry
+    key = _dumps([endpoint, sorted((k, str(v)) for k, v in (params or {}).items())])
+    digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+    return CACHE_DIR / f"{digest}.json"
+
+
+def _read_cache(path: Path):
+    """Return (validators, body bytes) from a cache file, or None.
+    
+    A file with a malformed header counts as a miss (and is overwritten).
+    """
+    try:
+        with open(path, 'rb') as f:
+            validators = _loads(f.readline())
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    if not isinstance(validators, dict):
+        return None
+    fetched = validators.get('fetched')
+    if isinstance(fetched, bool) or not isinstance(fetched, (int, float)):
+        return None
+    for header in ('etag', 'last_modified'):
+        if not isinstance(validators.get(header), (str, type(None))):
+            return None
+    return validators, body
+
+
+def _prune_cache():
+    """Delete cache files (and stray temp files) older than CACHE_MAX_AGE."""
+    cutoff = time.time() - CACHE_MAX_AGE
+    try:
+        with os.scandir(CACHE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
+def _write_cache(path: Path, validators: dict, body: bytes):
+    """Atomically store validators + raw body. Failures are ignored."""
+    global _PRUNED
+    if not _PRUNED:
+        # Query-keyed probes (slug=, tag_slug=) leave one file per search
+        _PRUNED = True
+        _prune_cache()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_dumps(validators) + b'\n')
+            f.write(body)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _conditional_get(endpoint: str, params: dict = None, stream: bool = False):
+    """GET through the disk cache. Returns (response, cached body).
+    
+    The body is None when the caller has to read the response itself. A
+    cached copy younger than CACHE_TTL is returned without a request
+    (response None); on 304 Not Modified its age is reset.
+    """
+    path = _cache_path(endpoint, params)
+    cached = None if _FRESH else _read_cache(path)
+    
+    headers = {}
+    if cached:
+        validators, body = cached
+        if time.time() - validators['fetched'] < CACHE_TTL:
+            return None, body
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    
     url = f"{BASE_URL}{endpoint}"
-    resp = requests.get(url, params=params, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    resp = _SESSION.get(url, params=params, headers=headers, timeout=30, stream=stream)
+    if resp.status_code == 304 and cached:
+        resp.close()
+        _write_cache(path, {**validators, 'fetched': time.time()}, body)
+        return resp, body
+    return resp, None
 
 
-def format_price(price) -> str:
-    """Format price as percentage."""
+def _store(endpoint: str, params: dict, resp: requests.Response, body: bytes):
+    """Cache a response body along with its validators and fetch time."""
+    validators = {
+        'etag': resp.headers.get('ETag'),
+        'last_modified': resp.headers.get('Last-Modified'),
+        'fetched': time.time(),
+    }
+    _write_cache(_cache_path(endpoint, params), validators, body)
+
+
+# In-process cache of parsed responses: (endpoint, params) -> (expiry, data)
+_MEMO = {}
+_MEMO_TTL = 30
+_MEMO_SIZE = 64
+_MEMO_LOCK = threading.Lock()
+
+
+def fetch(endpoint: str, params: dict = None) -> dict:
+    """Fetch from Gamma API.
+    
+    Repeat calls within _MEMO_TTL seconds are answered from memory; otherwise
+    the on-disk cache is consulted (see _conditional_get). Memoized results
+    are shared between callers, so treat them as read-only.
+    """
+    key = (endpoint, frozenset((params or {}).items()))
+    hit = _MEMO.get(key)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    
+    resp, body = _conditional_get(endpoint, params)
+    if body is None:
+        resp.raise_for_status()
+        body = resp.content
+        _store(endpoint, params, resp, body)
+    data = _loads(body)
+    
+    with _MEMO_LOCK:
+        if len(_MEMO) >= _MEMO_SIZE:
+            _MEMO.pop(next(iter(_MEMO)))
+        _MEMO[key] = (time.monotonic() + _MEMO_TTL, data)
+    return data
+
+
+def iter_events(endpoint: str, params: dict = None):
+    """Request a JSON array from Gamma API and return an iterator over its items.
+    
+    With ijson installed the body is parsed as it downloads, so a caller
+    that stops early never reads (or decodes) the tail. The request itself
+    is sent before this returns, which lets it run via _speculate().
+    """
+    if ijson is None:
+        return iter(fetch(endpoint, params))
+    
+    resp, body = _conditional_get(endpoint, params, stream=True)
+    if body is not None:
+        return iter(_loads(body))
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        resp.close()
+        raise
+    return _stream_items(endpoint, params, resp)
+
+
+def _stream_items(endpoint: str, params: dict, resp: requests.Response):
+    """Yield array items from a streamed response; cache it if fully read."""
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, 'item', use_float=True)
+    body = bytearray()
+    with resp:
+        for chunk in resp.iter_content(chunk_size=65536):
+            body += chunk
+            parser.send(chunk)
+            yield from items
+            del items[:]
+        parser.close()
+        yield from items
+    _store(endpoint, params, resp, bytes(body))
+
+
+# API values repeat heavily within an event ("0", "0.5", ...), so the
+# formatters below are memoized on their raw input
+_HASHABLE = (str, int, float, type(None))
+
+_NUM_RE = re.compile(r'-?\d+(\.\d+)?')
+
+
+def _to_float(value):
+    """Convert an API number (often a numeric string) to float, or None."""
+    if type(value) in (int, float):
+        return value
+    # Well-formed decimal strings can't raise, so skip the exception setup
+    if type(value) is str and _NUM_RE.fullmatch(value):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _format_price(price) -> str:
+    """Cached body of format_price()."""
     if price is None:
         return "N/A"
-    try:
-        pct = float(price) * 100
-        return f"{pct:.1f}%"
-    except:
+    pct = _to_float(price)
+    if pct is None:
         return str(price)
+    return f"{pct * 100:.1f}%"
 
 
-def format_volume(volume) -> str:
-    """Format volume in human readable form."""
+def format_price(price) -> str:
+    """Format price as percentage."""
+    if isinstance(price, _HASHABLE):
+        return _format_price(price)
+    return _format_price.__wrapped__(price)
+
+
+@lru_cache(maxsize=4096)
+def _format_volume(volume) -> str:
+    """Cached body of format_volume()."""
     if volume is None:
         return "N/A"
-    try:
-        v = float(volume)
-        if v >= 1_000_000:
-            return f"${v/1_000_000:.1f}M"
-        elif v >= 1_000:
-            return f"${v/1_000:.1f}K"
-        else:
-            return f"${v:.0f}"
-    except:
+    v = _to_float(volume)
+    if v is None:
         return str(volume)
+    if v >= 1_000_000:
+        return f"${v/1_000_000:.1f}M"
+    elif v >= 1_000:
+        return f"${v/1_000:.1f}K"
+    else:
+        return f"${v:.0f}"
 
 
-def format_change(change) -> str:
-    """Format price change with arrow."""
+def format_volume(volume) -> str:
+    """Format volume in human readable form."""
+    if isinstance(volume, _HASHABLE):
+        return _format_volume(volume)
+    return _format_volume.__wrapped__(volume)
+
+
+@lru_cache(maxsize=4096)
+def _format_change(change) -> str:
+    """Cached body of format_change()."""
     if change is None:
         return ""
-    try:
-        c = float(change) * 100
-        if c > 0:
-            return f"↑{c:.1f}%"
-        elif c < 0:
-            return f"↓{abs(c):.1f}%"
-        else:
-            return "→0%"
-    except:
+    c = _to_float(change)
+    if c is None:
         return ""
+    c *= 100
+    if c > 0:
+        return f"↑{c:.1f}%"
+    elif c < 0:
+        return f"↓{abs(c):.1f}%"
+    else:
+        return "→0%"
 
 
-def format_time_remaining(end_date: str) -> str:
+def format_change(change) -> str:
+    """Format price change with arrow."""
+    if isinstance(change, _HASHABLE):
+        return _format_change(change)
+    return _format_change.__wrapped__(change)
+
+
+# Reference time for a whole command, set once in main()
+_NOW = None
+
+
+def format_time_remaining(end_date: str, now: datetime = None) -> str:
     """Format time remaining until end date."""
-    if not end_date:
+    if not end_date or not isinstance(end_date, str):
         return ""
+    return _format_time_remaining(end_date, now or _NOW or datetime.now(timezone.utc))
+
+
+@lru_cache(maxsize=1024)
+def _format_time_remaining(end_date: str, now: datetime) -> str:
+    """Cached body of format_time_remaining().
+    
+    Markets in an event often share an end date, and 'now' is fixed for a
+    whole command, so repeats are a dict lookup instead of a parse.
+    """
     try:
-        dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
+        if end_date.endswith('Z'):
+            end_date = end_date[:-1] + '+00:00'
+        dt = datetime.fromisoformat(end_date)
         delta = dt - now
         
         if delta.days < 0:
@@ -98,166 +404,231 @@ def format_time_remaining(end_date: str) -> str:
             return f"Ends in {weeks}w"
         else:
             return dt.strftime('%b %d, %Y')
-    except:
+    except (TypeError, ValueError):
         return ""
 
 
+# polymarket.com/event/slug-here -> slug-here
+_SLUG_RE = re.compile(r'polymarket\.com/(?:event/)?([^/?#]+)')
+
+
 def extract_slug_from_url(url_or_slug: str) -> str:
     """Extract slug from Polymarket URL or return as-is if already a slug."""
-    if 'polymarket.com' in url_or_slug:
-        parsed = urlparse(url_or_slug)
-        path = parsed.path.strip('/')
-        # /event/slug-here -> slug-here
-        if path.startswith('event/'):
-            return path.replace('event/', '')
-        return path
-    return url_or_slug
+    # Bare slugs (the common case) can't contain a URL's separators
+    if '/' not in url_or_slug and ':' not in url_or_slug:
+        return url_or_slug
+    m = _SLUG_RE.search(url_or_slug)
+    return m.group(1) if m else url_or_slug
 
 
-def format_market(market: dict, verbose: bool = False) -> str:
+def format_market(market: dict, verbose: bool = False, now: datetime = None) -> str:
     """Format a single market for display."""
-    lines = []
+    return '\n'.join(market_lines(market, [], verbose, now))
+
+
+def market_lines(market: dict, lines: list, verbose: bool = False, now: datetime = None) -> list:
+    """Append a market's display lines to lines (and return it)."""
+    # Read every field we render once, up front
+    g = market.get
+    question = g('question') or g('title', 'Unknown')
+    prices, day_change, bid, ask = g('outcomePrices'), g('oneDayPriceChange'), g('bestBid'), g('bestAsk')
+    volume, vol_24h = g('volume') or g('volumeNum'), g('volume24hr')
+    end_date = g('endDate') or g('endDateIso')
+    slug = g('slug') or g('market_slug')
     
-    question = market.get('question') or market.get('title', 'Unknown')
     lines.append(f"📊 **{question}**")
     
     # Prices
-    prices = market.get('outcomePrices')
     if prices:
-        if isinstance(prices, str):
-            try:
-                prices = json.loads(prices)
-            except:
-                prices = None
-        
+        prices = _parse_prices(prices)
         if prices and len(prices) >= 2:
             yes_price = format_price(prices[0])
             no_price = format_price(prices[1])
             
             # Add price changes if available
-            day_change = format_change(market.get('oneDayPriceChange'))
+            day_change = format_change(day_change)
             change_str = f" ({day_change})" if day_change else ""
             
             lines.append(f"   Yes: {yes_price}{change_str} | No: {no_price}")
     
     # Bid/ask spread (liquidity indicator)
-    bid = market.get('bestBid')
-    ask = market.get('bestAsk')
-    if bid is not None and ask is not None:
-        spread = float(ask) - float(bid)
+    bid_f, ask_f = _to_float(bid), _to_float(ask)
+    if bid_f is not None and ask_f is not None:
+        spread = ask_f - bid_f
         if spread > 0:
             lines.append(f"   Spread: {spread*100:.1f}% (Bid: {format_price(bid)} / Ask: {format_price(ask)})")
     
     # Volume
-    volume = market.get('volume') or market.get('volumeNum')
     if volume:
         vol_str = f"   Volume: {format_volume(volume)}"
-        vol_24h = market.get('volume24hr')
-        if vol_24h and float(vol_24h) > 0:
+        if vol_24h and (_to_float(vol_24h) or 0) > 0:
             vol_str += f" (24h: {format_volume(vol_24h)})"
         lines.append(vol_str)
     
     # Time remaining
-    end_date = market.get('endDate') or market.get('endDateIso')
-    time_left = format_time_remaining(end_date)
+    time_left = format_time_remaining(end_date, now)
     if time_left:
         lines.append(f"   ⏰ {time_left}")
     
     # Verbose mode extras
     if verbose:
-        week_change = format_change(market.get('oneWeekPriceChange'))
-        month_change = format_change(market.get('oneMonthPriceChange'))
+        week_change = format_change(g('oneWeekPriceChange'))
+        month_change = format_change(g('oneMonthPriceChange'))
         if week_change or month_change:
             lines.append(f"   📈 1w: {week_change or 'N/A'} | 1m: {month_change or 'N/A'}")
         
-        liquidity = market.get('liquidityNum') or market.get('liquidity')
+        liquidity = g('liquidityNum') or g('liquidity')
         if liquidity:
             lines.append(f"   💧 Liquidity: {format_volume(liquidity)}")
     
     # Slug for reference
-    slug = market.get('slug') or market.get('market_slug')
     if slug:
         lines.append(f"   🔗 polymarket.com/event/{slug}")
     
-    return '\n'.join(lines)
+    return lines
+
 
+_PRICE_RE = re.compile(r'"(-?\d+(?:\.\d+)?)"')
 
-def format_event(event: dict, show_all_markets: bool = False) -> str:
+
+def _parse_prices(prices):
+    """Decode an outcomePrices string such as '["0.42", "0.58"]'.
+    
+    Non-strings are returned as-is; undecodable strings give [].
+    """
+    if not isinstance(prices, str):
+        return prices
+    # The API's fixed format needs no full JSON parse: pull the quoted
+    # numbers out directly, unless some element isn't a plain decimal
+    found = _PRICE_RE.findall(prices)
+    if found and len(found) == prices.count(',') + 1:
+        return [float(p) for p in found]
+    try:
+        return _loads(prices)
+    except ValueError:
+        return []
+
+
+def format_event(event: dict, show_all_markets: bool = False, now: datetime = None) -> str:
     """Format an event with its markets."""
-    lines = []
+    return '\n'.join(event_lines(event, [], show_all_markets, now))
+
+
+def event_lines(event: dict, lines: list, show_all_markets: bool = False,
+                now: datetime = None) -> list:
+    """Append an event's display lines to lines (and return it).
+    
+    Lets callers render many events into one list and join once.
+    """
+    # Read every field we render once, up front
+    g = event.get
+    title, volume, vol_24h, end_date, slug, markets = (
+        g('title', 'Unknown Event'), g('volume'), g('volume24hr'),
+        g('endDate'), g('slug'), g('markets', []),
+    )
     
-    title = event.get('title', 'Unknown Event')
     lines.append(f"🎯 **{title}**")
     
     # Event-level info
-    volume = event.get('volume')
     if volume:
         vol_str = f"   Volume: {format_volume(volume)}"
-        vol_24h = event.get('volume24hr')
-        if vol_24h and float(vol_24h) > 0:
+        if vol_24h and (_to_float(vol_24h) or 0) > 0:
             vol_str += f" (24h: {format_volume(vol_24h)})"
         lines.append(vol_str)
     
     # Time remaining
-    end_date = event.get('endDate')
-    time_left = format_time_remaining(end_date)
+    time_left = format_time_remaining(end_date, now)
     if time_left:
         lines.append(f"   ⏰ {time_left}")
     
     # Markets in this event - sort by price descending
-    markets = event.get('markets', [])
     if markets:
-        # Parse and sort markets by Yes price
+        # Parse markets' Yes price in the same pass as the filter
         market_prices = []
         for m in markets:
-            prices = m.get('outcomePrices')
-            if prices:
-                if isinstance(prices, str):
-                    try:
-                        prices = json.loads(prices)
-                    except:
-                        prices = []
-                if prices and len(prices) >= 1:
-                    try:
-                        yes_price = float(prices[0])
-                    except:
-                        yes_price = 0
-                else:
-                    yes_price = 0
-            else:
-                yes_price = 0
-            
+            mg = m.get
             # Skip inactive markets with 0 volume
-            if not m.get('active', True) and m.get('volumeNum', 0) == 0:
+            if not mg('active', True) and mg('volumeNum', 0) == 0:
                 continue
+            
+            prices = _parse_prices(mg('outcomePrices'))
+            # Already-numeric prices pass through _to_float untouched
+            yes_price = (_to_float(prices[0]) or 0) if isinstance(prices, list) and prices else 0
                 
             market_prices.append((m, yes_price))
         
-        # Sort by price descending
-        market_prices.sort(key=lambda x: x[1], reverse=True)
-        
-        lines.append(f"   Markets: {len(market_prices)}")
+        total = len(market_prices)
+        lines.append(f"   Markets: {total}")
         
-        display_count = len(market_prices) if show_all_markets else min(10, len(market_prices))
-        for m, price in market_prices[:display_count]:
-            name = m.get('groupItemTitle') or m.get('question', '')[:40]
-            vol = m.get('volumeNum', 0)
-            day_change = format_change(m.get('oneDayPriceChange'))
-            change_str = f" {day_change}" if day_change else ""
+        # Only the displayed markets need ordering (highest price first)
+        display_count = total if show_all_markets else min(10, total)
+        top = heapq.nlargest(display_count, market_prices, key=itemgetter(1))
+        for m, price in top:
+            mg = m.get
+            name = mg('groupItemTitle') or mg('question', '')[:40]
             
             if price > 0:
+                vol = mg('volumeNum', 0)
+                day_change = format_change(mg('oneDayPriceChange'))
+                change_str = f" {day_change}" if day_change else ""
                 lines.append(f"   • {name}: {format_price(price)}{change_str} ({format_volume(vol)})")
             else:
                 lines.append(f"   • {name}")
         
-        if len(market_prices) > display_count:
-            lines.append(f"   ... and {len(market_prices) - display_count} more")
+        if total > display_count:
+            lines.append(f"   ... and {total - display_count} more")
     
-    slug = event.get('slug')
     if slug:
         lines.append(f"   🔗 polymarket.com/event/{slug}")
     
-    return '\n'.join(lines)
+    return lines
+
+
+def dump_raw(endpoint: str, params: dict = None, skip_empty: bool = False) -> bool:
+    """Write an API response body to stdout as-is (--json).
+    
+    With skip_empty, an empty list is not written and False is returned so
+    the caller can try another query.
+    """
+    resp = _SESSION.get(f"{BASE_URL}{endpoint}", params=params, timeout=30)
+    resp.raise_for_status()
+    body = resp.content.strip()
+    if skip_empty and body == b'[]':
+        return False
+    sys.stdout.flush()
+    sys.stdout.buffer.write(body + b'\n')
+    return True
+
+
+def print_json(data):
+    """Write already-selected results as JSON (--json)."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_dumps(data) + b'\n')
+
+
+def print_events(events: list, header: str = None, show_all_markets: bool = False):
+    """Print an optional header and formatted events, blank-line separated."""
+    # One clock read for the whole listing, even outside main()
+    now = _NOW or datetime.now(timezone.utc)
+    lines = [header, ''] if header else []
+    for event in events:
+        event_lines(event, lines, show_all_markets, now)
+        lines.append('')
+    write_lines(lines)
+
+
+def write_lines(lines: list):
+    """Write lines to stdout, encoded to UTF-8 once, in a single call."""
+    if not lines:
+        return
+    out = '\n'.join(lines) + '\n'
+    
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if buffer is None:
+        sys.stdout.write(out)
+        return
+    sys.stdout.flush()
+    buffer.write(out.encode('utf-8'))
 
 
 def cmd_trending(args):
@@ -269,13 +640,13 @@ def cmd_trending(args):
         'limit': args.limit
     }
     
-    data = fetch('/events', params)
+    if args.json:
+        dump_raw('/events', params)
+        return
     
-    print(f"🔥 **Trending on Polymarket**\n")
+    data = fetch('/events', params)
     
-    for event in data:
-        print(format_event(event))
-        print()
+    print_events(data, header="🔥 **Trending on Polymarket**")
 
 
 def cmd_featured(args):
@@ -286,24 +657,166 @@ def cmd_featured(args):
         'limit': args.limit
     }
     
-    data = fetch('/events', params)
+    # Fallback to high volume
+    fallback_params = {
+        'order': 'volume',
+        'ascending': 'false',
+        'closed': 'false',
+        'limit': args.limit
+    }
+    
+    if args.json:
+        dump_raw('/events', params, skip_empty=True) or dump_raw('/events', fallback_params)
+        return
     
-    print(f"⭐ **Featured Markets**\n")
+    # Start the fallback alongside the featured query; it is abandoned
+    # (not waited for) when there are featured events
+    fallback_future = _speculate(fetch, '/events', fallback_params)
+    
+    data = fetch('/events', params)
+    header = "⭐ **Featured Markets**"
     
     if not data:
-        # Fallback to high volume
-        params = {
-            'order': 'volume',
-            'ascending': 'false',
-            'closed': 'false',
-            'limit': args.limit
-        }
-        data = fetch('/events', params)
-        print("(Showing highest volume markets)\n")
+        data = fallback_future.result()
+        header += "\n\n(Showing highest volume markets)"
     
-    for event in data:
-        print(format_event(event))
-        print()
+    print_events(data, header=header)
+
+
+# Query expansion tables, built once at import; expand_query() only reads them.
+
+# ===== SYNONYM MAPPINGS =====
+# Sports events
+_SPORTS_EVENTS = {
+    'championship': ('champion', 'winner', 'tournament', 'title', 'finals'),
+    'champion': ('championship', 'winner', 'tournament', 'title'),
+    'march madness': ('ncaa', 'tournament', 'final four', 'college basketball'),
+    'final four': ('ncaa', 'tournament', 'march madness', 'semifinal'),
+    'ncaa': ('college', 'tournament', 'march madness'),
+    'super bowl': ('nfl', 'championship', 'football'),
+    'world series': ('mlb', 'championship', 'baseball'),
+    'stanley cup': ('nhl', 'championship', 'hockey'),
+    'nba finals': ('championship', 'basketball', 'nba champion'),
+    'playoffs': ('postseason', 'championship'),
+    'mvp': ('most valuable', 'award'),
+}
+
+# Player/team actions
+_ACTIONS = {
+    'trade': ('traded', 'next team', 'destination', 'move'),
+    'traded': ('trade', 'next team', 'destination'),
+    'sign': ('signed', 'signing', 'contract', 'free agent'),
+    'retire': ('retired', 'retirement'),
+    'win': ('winner', 'won', 'wins', 'winning'),
+    'winner': ('win', 'wins', 'champion'),
+    'beat': ('defeat', 'over', 'vs'),
+}
+
+# Politics
+_POLITICS = {
+    'election': ('president', 'presidential', 'vote', 'elect'),
+    'president': ('election', 'presidential', 'potus'),
+    'senate': ('senator', 'congress'),
+    'congress': ('house', 'senate', 'congressional'),
+    'republican': ('gop', 'rep'),
+    'democrat': ('dem', 'democratic'),
+    'primary': ('nomination', 'nominee'),
+}
+
+# Economics/business
+_ECONOMICS = {
+    'fed': ('federal reserve', 'interest rate', 'fomc'),
+    'rate cut': ('interest rate', 'fed', 'rate hike'),
+    'rate hike': ('interest rate', 'fed', 'rate cut'),
+    'recession': ('economy', 'gdp', 'downturn'),
+    'inflation': ('cpi', 'prices'),
+    'ipo': ('public', 'listing'),
+    'acquisition': ('acquire', 'bought', 'merger'),
+}
+
+# Crypto
+_CRYPTO = {
+    'bitcoin': ('btc', 'crypto'),
+    'btc': ('bitcoin', 'crypto'),
+    'ethereum': ('eth', 'crypto'),
+    'eth': ('ethereum', 'crypto'),
+    'ath': ('all time high', 'record'),
+    'moon': ('surge', 'rally', 'pump'),
+}
+
+# Tech/AI
+_TECH = {
+    'ai': ('artificial intelligence', 'gpt', 'llm', 'chatgpt'),
+    'agi': ('artificial general intelligence', 'ai'),
+    'release': ('launch', 'announce', 'ship'),
+    'iphone': ('apple', 'ios'),
+}
+
+# Combine all mappings, interning every term: literals with spaces or
+# punctuation aren't interned by the compiler, and interned terms make
+# the expansion set's equality checks a pointer comparison
+_ALL_SYNONYMS = {
+    sys.intern(key): tuple(map(sys.intern, values))
+    for key, values in {**_SPORTS_EVENTS, **_ACTIONS, **_POLITICS,
+                        **_ECONOMICS, **_CRYPTO, **_TECH}.items()
+}
+
+# ===== LEAGUE/SPORT ASSOCIATIONS =====
+_SPORT_LEAGUES = {
+    'nba': ('basketball', 'hoops'),
+    'nfl': ('football',),
+    'mlb': ('baseball',),
+    'nhl': ('hockey',),
+    'mls': ('soccer',),
+    'ufc': ('mma', 'fight'),
+    'pga': ('golf',),
+    'atp': ('tennis',),
+    'wta': ('tennis',),
+    'f1': ('formula 1', 'racing'),
+}
+
+# ===== WORD VARIATIONS =====
+# Common suffixes to strip/add
+_SUFFIXES = (('ing', ''), ('ed', ''), ('er', ''), ('s', ''), ('ment', ''))
+
+# Common filler phrases stripped from questions
+_ABBREVIATIONS = {
+    'who will': '',
+    'will': '',
+    'what are': '',
+    'the odds': 'odds',
+    "what's": '',
+    'whats': '',
+}
+
+# Synonym entries bucketed by the key's first character: a key can only
+# occur in the query if its first character does.
+_SYNONYMS_BY_FIRST_CHAR = {}
+for _key, _values in _ALL_SYNONYMS.items():
+    _SYNONYMS_BY_FIRST_CHAR.setdefault(_key[0], []).append((_key, _values))
+del _key, _values
+
+# With pyahocorasick, one automaton pass finds every synonym key in the query
+_SYNONYM_AUTOMATON = None
+if ahocorasick is not None:
+    _SYNONYM_AUTOMATON = ahocorasick.Automaton()
+    for _key, _values in _ALL_SYNONYMS.items():
+        _SYNONYM_AUTOMATON.add_word(_key, (_key, _values))
+    _SYNONYM_AUTOMATON.make_automaton()
+    del _key, _values
+
+
+def _matching_synonyms(query: str):
+    """(key, values) for every synonym key that occurs in query."""
+    if _SYNONYM_AUTOMATON is not None:
+        # A key can match at several positions; keep each once
+        return dict(value for _, value in _SYNONYM_AUTOMATON.iter(query)).items()
+    return [
+        (key, values)
+        for ch in set(query)
+        for key, values in _SYNONYMS_BY_FIRST_CHAR.get(ch, ())
+        if key in query
+    ]
 
 
 def expand_query(query: str) -> list:
@@ -312,105 +825,16 @@ def expand_query(query: str) -> list:
     expansions = set([query])
     words = query.split()
     
-    # ===== SYNONYM MAPPINGS =====
-    # Sports events
-    sports_events = {
-        'championship': ['champion', 'winner', 'tournament', 'title', 'finals'],
-        'champion': ['championship', 'winner', 'tournament', 'title'],
-        'march madness': ['ncaa', 'tournament', 'final four', 'college basketball'],
-        'final four': ['ncaa', 'tournament', 'march madness', 'semifinal'],
-        'ncaa': ['college', 'tournament', 'march madness'],
-        'super bowl': ['nfl', 'championship', 'football'],
-        'world series': ['mlb', 'championship', 'baseball'],
-        'stanley cup': ['nhl', 'championship', 'hockey'],
-        'nba finals': ['championship', 'basketball', 'nba champion'],
-        'playoffs': ['postseason', 'championship'],
-        'mvp': ['most valuable', 'award'],
-    }
-    
-    # Player/team actions
-    actions = {
-        'trade': ['traded', 'next team', 'destination', 'move'],
-        'traded': ['trade', 'next team', 'destination'],
-        'sign': ['signed', 'signing', 'contract', 'free agent'],
-        'retire': ['retired', 'retirement'],
-        'win': ['winner', 'won', 'wins', 'winning'],
-        'winner': ['win', 'wins', 'champion'],
-        'beat': ['defeat', 'over', 'vs'],
-    }
-    
-    # Politics
-    politics = {
-        'election': ['president', 'presidential', 'vote', 'elect'],
-        'president': ['election', 'presidential', 'potus'],
-        'senate': ['senator', 'congress'],
-        'congress': ['house', 'senate', 'congressional'],
-        'republican': ['gop', 'rep'],
-        'democrat': ['dem', 'democratic'],
-        'primary': ['nomination', 'nominee'],
-    }
-    
-    # Economics/business
-    economics = {
-        'fed': ['federal reserve', 'interest rate', 'fomc'],
-        'rate cut': ['interest rate', 'fed', 'rate hike'],
-        'rate hike': ['interest rate', 'fed', 'rate cut'],
-        'recession': ['economy', 'gdp', 'downturn'],
-        'inflation': ['cpi', 'prices'],
-        'ipo': ['public', 'listing'],
-        'acquisition': ['acquire', 'bought', 'merger'],
-    }
-    
-    # Crypto
-    crypto = {
-        'bitcoin': ['btc', 'crypto'],
-        'btc': ['bitcoin', 'crypto'],
-        'ethereum': ['eth', 'crypto'],
-        'eth': ['ethereum', 'crypto'],
-        'ath': ['all time high', 'record'],
-        'moon': ['surge', 'rally', 'pump'],
-    }
-    
-    # Tech/AI
-    tech = {
-        'ai': ['artificial intelligence', 'gpt', 'llm', 'chatgpt'],
-        'agi': ['artificial general intelligence', 'ai'],
-        'release': ['launch', 'announce', 'ship'],
-        'iphone': ['apple', 'ios'],
-    }
-    
-    # Combine all mappings
-    all_synonyms = {**sports_events, **actions, **politics, **economics, **crypto, **tech}
-    
-    # ===== LEAGUE/SPORT ASSOCIATIONS =====
-    sport_leagues = {
-        'nba': ['basketball', 'hoops'],
-        'nfl': ['football'],
-        'mlb': ['baseball'],
-        'nhl': ['hockey'],
-        'mls': ['soccer'],
-        'ufc': ['mma', 'fight'],
-        'pga': ['golf'],
-        'atp': ['tennis'],
-        'wta': ['tennis'],
-        'f1': ['formula 1', 'racing'],
-    }
-    
-    # ===== WORD VARIATIONS =====
-    # Common suffixes to strip/add
-    suffixes = [('ing', ''), ('ed', ''), ('er', ''), ('s', ''), ('ment', '')]
-    
     # ===== EXPANSION LOGIC =====
     
     # 1. Apply synonym mappings
-    for key, values in all_synonyms.items():
-        if key in query:
-            for v in values:
-                expansions.add(query.replace(key, v))
-                expansions.add(v)
+    for key, values in _matching_synonyms(query):
+        for v in values:
+            expansions.add(query.replace(key, v))
+            expansions.add(v)
     
     # 2. Add league/sport associations
-    for league, sports in sport_leagues.items():
+    for league, sports in _SPORT_LEAGUES.items():
         if league in query:
             for s in sports:
                 expansions.add(query.replace(league, s))
@@ -422,7 +846,7 @@ def expand_query(query: str) -> list:
     # 3. Add word stem variations
     for word in words:
         if len(word) >= 4:
-            for old_suffix, new_suffix in suffixes:
+            for old_suffix, new_suffix in _SUFFIXES:
                 if word.endswith(old_suffix):
                     stem = word[:-len(old_suffix)] + new_suffix
                     if len(stem) >= 3:
@@ -439,15 +863,7 @@ def expand_query(query: str) -> list:
     expansions.add(slug_version)
     
     # 6. Handle common abbreviations
-    abbreviations = {
-        'who will': '',
-        'will': '',
-        'what are': '',
-        'the odds': 'odds',
-        "what's": '',
-        'whats': '',
-    }
-    for phrase, replacement in abbreviations.items():
+    for phrase, replacement in _ABBREVIATIONS.items():
         if phrase in query:
             cleaned = query.replace(phrase, replacement).strip()
             if cleaned:
@@ -456,70 +872,81 @@ def expand_query(query: str) -> list:
     return list(expansions)
 
 
+def search_text(event: dict) -> str:
+    """Lowercased searchable text of an event and its markets.
+    
+    Fields are NUL-separated so a query can never match across two of them.
+    """
+    parts = [event.get('slug') or '', event.get('title') or '', event.get('description') or '']
+    for m in event.get('markets') or []:
+        parts.append(m.get('question') or '')
+        parts.append(m.get('groupItemTitle') or '')
+    return '\x00'.join(parts).lower()
+
+
 def cmd_search(args):
     """Search markets with fuzzy matching and synonym expansion."""
     query = args.query.lower()
-    queries = expand_query(query)
+    queries = tuple(expand_query(query))
+    # One alternation scan per haystack instead of a substring test per variation
+    pattern = re.compile('|'.join(map(re.escape, sorted(queries, key=len, reverse=True))))
     
-    # First try slug-based lookup
+    # The tag lookup and the fallback scan don't depend on the slug lookup -
+    # start them now. The scan streams, so its body is only read on a miss;
+    # both are speculative and simply abandoned on a hit.
     slug_guess = query.replace(' ', '-')
-    try:
-        data = fetch('/events', {'slug': slug_guess, 'closed': 'false'})
+    tag_future = _speculate(fetch, '/events', {'tag_slug': slug_guess, 'closed': 'false', 'limit': args.limit})
+    all_future = _speculate(iter_events, '/events', {'closed': 'false', 'limit': 500})
+    
+    # First try slug-based lookup, then let the API filter by tag
+    slug_lookup = partial(fetch, '/events', {'slug': slug_guess, 'closed': 'false'})
+    for lookup, label in ((slug_lookup, 'Found'), (tag_future.result, 'Search')):
+        try:
+            data = lookup()
+        except (requests.RequestException, ValueError):
+            continue
         if data:
-            print(f"🔍 **Found: '{args.query}'**\n")
-            for event in data[:args.limit]:
-                print(format_event(event, show_all_markets=args.all))
-                print()
+            if args.json:
+                print_json(data[:args.limit])
+                return
+            print_events(data[:args.limit], header=f"🔍 **{label}: '{args.query}'**",
+                         show_all_markets=args.all)
             return
-    except:
-        pass
     
     # Try partial slug match with expanded queries
     try:
-        data = fetch('/events', {'closed': 'false', 'limit': 500})
-        matches = []
+        events = all_future.result()
         
-        for event in data:
-            slug = event.get('slug', '').lower()
-            title = event.get('title', '').lower()
-            desc = event.get('description', '').lower()
-            
-            # Check slug, title, description against all query variations
-            found = False
-            for q in queries:
-                if q in slug or q in title or q in desc:
-                    matches.append(event)
-                    found = True
-                    break
-            
-            if found:
-                continue
-            
-            # Check individual markets
-            for m in event.get('markets', []):
-                mq = m.get('question', '').lower()
-                item = m.get('groupItemTitle', '').lower()
-                for q in queries:
-                    if q in mq or q in item:
-                        matches.append(event)
-                        found = True
-                        break
-                if found:
+        # Check slug, title, description and each market's question/outcome
+        # against all query variations, stopping once we have enough
+        matches = []
+        for event in events:
+            if pattern.search(search_text(event)):
+                matches.append(event)
+                if len(matches) >= args.limit:
                     break
+        # Stopping early leaves the stream open; release it before rendering
+        if hasattr(events, 'close'):
+            events.close()
         
-        print(f"🔍 **Search: '{args.query}'**\n")
+        if args.json:
+            print_json(matches[:args.limit])
+            return
         
         if not matches:
+            print(f"🔍 **Search: '{args.query}'**\n")
             print("No markets found.")
             print(f"\nTip: Try the full slug from the URL, e.g.:")
             print(f"  polymarket event where-will-giannis-be-traded")
             return
         
-        for event in matches[:args.limit]:
-            print(format_event(event, show_all_markets=args.all))
-            print()
+        print_events(matches[:args.limit], header=f"🔍 **Search: '{args.query}'**",
+                     show_all_markets=args.all)
             
     except Exception as e:
+        if args.json:
+            # Keep stdout JSON-only; main() reports it on stderr and exits 1
+            raise
         print(f"Search error: {e}")
 
 
@@ -527,18 +954,25 @@ def cmd_event(args):
     """Get specific event by slug or URL."""
     slug = extract_slug_from_url(args.slug)
     
+    # Start the partial-match scan alongside the direct lookup; it is
+    # abandoned (not waited for) when the slug hits
+    all_future = _speculate(fetch, '/events', {'closed': 'false', 'limit': 200})
+    
     try:
         # Try direct slug lookup
         data = fetch('/events', {'slug': slug})
         
         if not data:
             # Try partial match
-            all_events = fetch('/events', {'closed': 'false', 'limit': 200})
+            all_events = all_future.result()
             slug_lower = slug.lower()
             matches = [e for e in all_events if slug_lower in e.get('slug', '').lower()]
             
             if matches:
                 data = matches
+            elif args.json:
+                print_json([])
+                return
             else:
                 print(f"❌ Event not found: {slug}")
                 print(f"\nTip: Search for it first:")
@@ -547,13 +981,19 @@ def cmd_event(args):
         
         event = data[0] if isinstance(data, list) and data else data
         
+        if args.json:
+            print_json([event])
+            return
+        
         print(format_event(event, show_all_markets=True))
         
     except requests.HTTPError as e:
-        if e.response.status_code == 404:
-            print(f"❌ Event not found: {slug}")
-        else:
+        if e.response.status_code != 404:
             raise
+        if args.json:
+            print_json([])
+        else:
+            print(f"❌ Event not found: {slug}")
 
 
 def cmd_market(args):
@@ -562,10 +1002,17 @@ def cmd_market(args):
     outcome = args.outcome.lower() if args.outcome else None
     
     try:
+        if args.json and not outcome:
+            dump_raw('/events', {'slug': slug})
+            return
+        
         data = fetch('/events', {'slug': slug})
         
         if not data:
-            print(f"❌ Event not found: {slug}")
+            if args.json:
+                print_json([])
+            else:
+                print(f"❌ Event not found: {slug}")
             return
         
         event = data[0] if isinstance(data, list) else data
@@ -573,10 +1020,12 @@ def cmd_market(args):
         
         if not outcome:
             # Show all markets
-            print(f"🎯 **{event.get('title')}**\n")
+            now = _NOW or datetime.now(timezone.utc)
+            lines = [f"🎯 **{event.get('title')}**", '']
             for m in markets:
-                print(format_market(m, verbose=True))
-                print()
+                market_lines(m, lines, verbose=True, now=now)
+                lines.append('')
+            write_lines(lines)
             return
         
         # Find matching market
@@ -584,9 +1033,16 @@ def cmd_market(args):
             name = m.get('groupItemTitle', '').lower()
             question = m.get('question', '').lower()
             if outcome in name or outcome in question:
-                print(format_market(m, verbose=True))
+                if args.json:
+                    print_json([m])
+                else:
+                    print(format_market(m, verbose=True))
                 return
         
+        if args.json:
+            print_json([])
+            return
+        
         print(f"❌ Outcome '{args.outcome}' not found")
         print(f"\nAvailable outcomes:")
         for m in markets[:15]:
@@ -594,53 +1050,71 @@ def cmd_market(args):
             print(f"  • {name}")
                 
     except requests.HTTPError as e:
-        if e.response.status_code == 404:
-            print(f"❌ Event not found: {slug}")
-        else:
+        if e.response.status_code != 404:
             raise
+        if args.json:
+            print_json([])
+        else:
+            print(f"❌ Event not found: {slug}")
+
+
+# Keywords matched against event titles and tag labels, per category
+_CATEGORIES = {
+    'politics': ('politics', 'election', 'trump', 'biden', 'congress'),
+    'crypto': ('crypto', 'bitcoin', 'ethereum', 'btc', 'eth'),
+    'sports': ('sports', 'nba', 'nfl', 'mlb', 'soccer'),
+    'tech': ('tech', 'ai', 'apple', 'google', 'microsoft'),
+    'entertainment': ('entertainment', 'movie', 'oscar', 'grammy'),
+    'science': ('science', 'space', 'nasa', 'climate'),
+    'business': ('business', 'fed', 'interest', 'stock', 'market'),
+}
+
+_CATEGORY_RE = {
+    name: re.compile('|'.join(map(re.escape, keywords)), re.I)
+    for name, keywords in _CATEGORIES.items()
+}
 
 
 def cmd_category(args):
     """Get markets by category."""
-    categories = {
-        'politics': ['politics', 'election', 'trump', 'biden', 'congress'],
-        'crypto': ['crypto', 'bitcoin', 'ethereum', 'btc', 'eth'],
-        'sports': ['sports', 'nba', 'nfl', 'mlb', 'soccer'],
-        'tech': ['tech', 'ai', 'apple', 'google', 'microsoft'],
-        'entertainment': ['entertainment', 'movie', 'oscar', 'grammy'],
-        'science': ['science', 'space', 'nasa', 'climate'],
-        'business': ['business', 'fed', 'interest', 'stock', 'market']
-    }
-    
-    tags = categories.get(args.category.lower(), [args.category.lower()])
+    category = args.category.lower()
+    pattern = _CATEGORY_RE.get(category) or re.compile(re.escape(category), re.I)
     
-    data = fetch('/events', {
+    params = {
         'closed': 'false',
-        'limit': 100,
         'order': 'volume24hr',
         'ascending': 'false'
-    })
+    }
     
-    matches = []
-    for event in data:
-        title = event.get('title', '').lower()
-        event_tags = [t.get('label', '').lower() for t in event.get('tags', [])]
-        
-        for tag in tags:
-            if tag in title or tag in ' '.join(event_tags):
+    # Ask the API for the category's tag; scan top events by keyword as a
+    # fallback, abandoned (not waited for) when the tag query hits
+    all_future = _speculate(fetch, '/events', {**params, 'limit': 100})
+    try:
+        matches = fetch('/events', {**params, 'tag_slug': category, 'limit': args.limit})
+    except (requests.RequestException, ValueError):
+        matches = []
+    
+    if not matches:
+        # Fresh list: the (empty) tag result is memoized and must stay as-is
+        matches = []
+        for event in all_future.result():
+            # Title and tag labels, one per line, checked in a single regex scan
+            haystack = '\n'.join([event.get('title', '')] + [t.get('label', '') for t in event.get('tags', [])])
+            
+            if pattern.search(haystack):
                 matches.append(event)
-                break
     
-    print(f"📁 **Category: {args.category.title()}**\n")
+    if args.json:
+        print_json(matches[:args.limit])
+        return
     
     if not matches:
+        print(f"📁 **Category: {args.category.title()}**\n")
         print(f"No markets found for '{args.category}'")
-        print(f"\nAvailable categories: politics, crypto, sports, tech, entertainment, science, business")
+        print(f"\nAvailable categories: {', '.join(_CATEGORIES)}")
         return
     
-    for event in matches[:args.limit]:
-        print(format_event(event))
-        print()
+    print_events(matches[:args.limit], header=f"📁 **Category: {args.category.title()}**")
 
 
 def main():
@@ -648,6 +1122,7 @@ def main():
     parser.add_argument("--limit", "-l", type=int, default=5, help="Number of results")
     parser.add_argument("--json", "-j", action="store_true", help="Output raw JSON")
     parser.add_argument("--all", "-a", action="store_true", help="Show all markets in event")
+    parser.add_argument("--fresh", action="store_true", help="Bypass the response cache")
     
     subparsers = parser.add_subparsers(dest="command", required=True)
     
@@ -686,6 +1161,10 @@ def main():
         "category": cmd_category,
     }
     
+    global _NOW, _FRESH
+    _NOW = datetime.now(timezone.utc)
+    _FRESH = args.fresh
+    
     try:
         commands[args.command](args)
     except requests.RequestException as e: